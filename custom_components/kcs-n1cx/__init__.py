@@ -1,7 +1,7 @@
 """
 Script file: __init__.py
 Created on: Oct 19, 2021
-Last modified on: Oct 21, 2021
+Last modified on: Oct 19, 2026
 
 Comments:
     KCS TraceME N1Cx integration
@@ -9,10 +9,22 @@ Comments:
 
 import logging
 
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from .const import (
     DOMAIN,
     PLATFORM,
-    DATA_LISTENER
+    DATA_LISTENER,
+    DATA_COORDINATOR,
+    DATA_METRICS
+)
+from .metrics import (
+    KCSTraceMeN1CxMetrics,
+    KCSTraceMeN1CxMetricsView
+)
+from .coordinator import (
+    async_setup_devices,
+    async_unload_devices,
+    async_update_entry
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,7 +37,11 @@ async def async_setup(hass, config) -> bool:
     :param config: config file
     :return: true (expired)
     """
-    hass.data[DOMAIN] = {DATA_LISTENER: {}}
+    metrics = KCSTraceMeN1CxMetrics()
+    hass.data[DOMAIN] = {DATA_LISTENER: {}, DATA_COORDINATOR: {}, DATA_METRICS: metrics}
+
+    # openmetrics endpoint for all configured devices
+    hass.http.register_view(KCSTraceMeN1CxMetricsView(metrics))
     return True
 
 
@@ -36,9 +52,16 @@ async def async_setup_entry(hass, config_entry):
     :param config_entry: config entry
     :return: true if successful
     """
+    # fetch initial data for every configured DevEUI, retry while mqtt is not available
+    try:
+        await async_setup_devices(hass, config_entry)
+    except HomeAssistantError as err:
+        await async_unload_devices(hass, config_entry)
+        raise ConfigEntryNotReady(f"Failed to subscribe to MQTT uplinks: {str(err)}") from err
+
     # update options
-    hass.data[DOMAIN][DATA_LISTENER][config_entry.entry_id] = config_entry.add_update_listener(async_reload_entry)
-    
+    hass.data[DOMAIN][DATA_LISTENER][config_entry.entry_id] = config_entry.add_update_listener(async_update_options)
+
     # add sensor
     hass.async_create_task(
         hass.config_entries.async_forward_entry_setup(config_entry, PLATFORM)
@@ -58,6 +81,7 @@ async def async_unload_entry(hass, config_entry):
         await hass.config_entries.async_forward_entry_unload(config_entry, PLATFORM)
         remove_listener = hass.data[DOMAIN][DATA_LISTENER].pop(config_entry.entry_id)
         remove_listener()
+        await async_unload_devices(hass, config_entry)
         _LOGGER.debug("Successfully removed sensor from the kcs_n1cx integration!")
         return True
     except ValueError as ex:
@@ -65,12 +89,13 @@ async def async_unload_entry(hass, config_entry):
         return False
 
 
-async def async_reload_entry(hass, config_entry):
+async def async_update_options(hass, config_entry):
     """
     Handle an options update
+    Reconfigures the running coordinators and entities in place instead of reloading the entry
     :param hass: home assistant object
     :param config_entry: config entry
     :return: none
     """
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    await async_update_entry(hass, config_entry)
     _LOGGER.debug("Options parameter updated!")
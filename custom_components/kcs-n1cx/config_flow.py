@@ -1,7 +1,7 @@
 """
 Script file: config_flow.py
 Created on: Oct 19, 2021
-Last modified on: Nov 2, 2021
+Last modified on: Oct 19, 2026
 
 Comments:
     Config flow for KCS TraceME N1Cx
@@ -11,6 +11,7 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components.mqtt import DOMAIN as MQTT_DOMAIN
 from homeassistant.core import callback
 from homeassistant.const import (
     CONF_NAME
@@ -24,10 +25,22 @@ from .const import (
     CONF_AIR_QUALITY,
     CONF_BATTERY,
     CONF_ALL,
+    CONF_SCAN_INTERVAL,
+    CONF_MQTT,
+    CONF_MQTT_TOPIC,
 
     DEFAULT_NAME,
     DEFAULT_DEV_EUI,
     DEFAULT_GAS,
+    DEFAULT_TEMPERATURE,
+    DEFAULT_HUMIDITY,
+    DEFAULT_PRESSURE,
+    DEFAULT_AIR_QUALITY,
+    DEFAULT_BATTERY,
+    DEFAULT_ALL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MQTT,
+    DEFAULT_MQTT_TOPIC,
 
     DOMAIN
 )
@@ -122,7 +135,11 @@ class KCSTraceMeN1CxOptionsFlow(config_entries.OptionsFlow):
         """
         errors = {}
 
-        if user_input is not None:
+        # uplinks can only be received once the mqtt integration is set up
+        if user_input is not None and user_input.get(CONF_MQTT) and MQTT_DOMAIN not in self.hass.config.components:
+            errors[CONF_MQTT] = "mqtt_not_loaded"
+
+        elif user_input is not None:
             try:
                 return self.async_create_entry(
                     title="",
@@ -132,15 +149,22 @@ class KCSTraceMeN1CxOptionsFlow(config_entries.OptionsFlow):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
 
+        # current values, options take precedence over the initial config
+        current = {**self.config_entry.data, **self.config_entry.options}
+
         # schema
         config = {
-            vol.Optional(CONF_DEV_EUI, default=self.config_entry.options.get(CONF_DEV_EUI)): str,
-            vol.Optional(CONF_TEMPERATURE, default=self.config_entry.options.get(CONF_TEMPERATURE)): bool,
-            vol.Optional(CONF_HUMIDITY, default=self.config_entry.options.get(CONF_HUMIDITY)): bool,
-            vol.Optional(CONF_PRESSURE, default=self.config_entry.options.get(CONF_PRESSURE)): bool,
-            vol.Optional(CONF_AIR_QUALITY, default=self.config_entry.options.get(CONF_AIR_QUALITY)): bool,
-            vol.Optional(CONF_BATTERY, default=self.config_entry.options.get(CONF_BATTERY)): bool,
-            vol.Optional(CONF_ALL, default=self.config_entry.options.get(CONF_ALL)): bool,
+            vol.Optional(CONF_DEV_EUI, default=current.get(CONF_DEV_EUI, DEFAULT_DEV_EUI)): str,
+            vol.Optional(CONF_TEMPERATURE, default=current.get(CONF_TEMPERATURE, DEFAULT_TEMPERATURE)): bool,
+            vol.Optional(CONF_HUMIDITY, default=current.get(CONF_HUMIDITY, DEFAULT_HUMIDITY)): bool,
+            vol.Optional(CONF_PRESSURE, default=current.get(CONF_PRESSURE, DEFAULT_PRESSURE)): bool,
+            vol.Optional(CONF_AIR_QUALITY, default=current.get(CONF_AIR_QUALITY, DEFAULT_AIR_QUALITY)): bool,
+            vol.Optional(CONF_BATTERY, default=current.get(CONF_BATTERY, DEFAULT_BATTERY)): bool,
+            vol.Optional(CONF_ALL, default=current.get(CONF_ALL, DEFAULT_ALL)): bool,
+            vol.Optional(CONF_SCAN_INTERVAL, default=current.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)):
+                vol.All(vol.Coerce(int), vol.Range(min=60)),
+            vol.Optional(CONF_MQTT, default=current.get(CONF_MQTT, DEFAULT_MQTT)): bool,
+            vol.Optional(CONF_MQTT_TOPIC, default=current.get(CONF_MQTT_TOPIC, DEFAULT_MQTT_TOPIC)): str,
         }
 
         return self.async_show_form(
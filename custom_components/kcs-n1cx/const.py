@@ -1,7 +1,7 @@
 """
 Script file: const.py
 Created on: Oct 19, 2021
-Last modified on: Nov 6, 2021
+Last modified on: Oct 19, 2026
 
 Comments:
     Constants for the KCS TraceME N1Cx integration
@@ -9,6 +9,13 @@ Comments:
 
 DOMAIN = "kcs_n1cx"
 DATA_LISTENER = "listener"
+DATA_COORDINATOR = "coordinator"
+DATA_METRICS = "metrics"
+
+# dispatcher signals
+SIGNAL_DEVICE_ADDED = "kcs_n1cx_device_added_{}"
+SIGNAL_DEVICE_REMOVED = "kcs_n1cx_device_removed_{}"
+SIGNAL_OPTIONS_UPDATED = "kcs_n1cx_options_updated_{}"
 
 # config options
 CONF_DEV_EUI = "dev_eui"
@@ -19,12 +26,17 @@ CONF_PRESSURE = "pressure"
 CONF_AIR_QUALITY = "air_quality"
 CONF_BATTERY = "battery"
 CONF_ALL = "all"
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_MQTT = "mqtt"
+CONF_MQTT_TOPIC = "mqtt_topic"
 
 # properties
 PLATFORM = "sensor"
 ATTRIBUTION = "CO2 gas PPM data from https://trace.me, delivered by KCS."
 SENSOR_TYPE = "usage"
 ICON = "mdi:flash"
+METRICS_URL = "/api/kcs_n1cx/metrics"
+METRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
 
 # default values
 DEFAULT_NAME = "CO2 Level"
@@ -37,6 +49,12 @@ DEFAULT_PRESSURE = False
 DEFAULT_AIR_QUALITY = False
 DEFAULT_BATTERY = False
 DEFAULT_ALL = False
+DEFAULT_SCAN_INTERVAL = 600
+DEFAULT_MQTT = False
+DEFAULT_MQTT_TOPIC = "application/+/device/{dev_eui}/rx, application/+/device/{dev_eui}/event/up, v3/+/devices/+/up"
+
+# mqtt uplinks received within this window (seconds) are written in a single batch
+MQTT_BATCH_DELAY = 1
 
 # attributes
 ATTR_DEVICE_TYPE = "Device Type"
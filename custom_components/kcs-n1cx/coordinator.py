@@ -0,0 +1,329 @@
+"""
+Script file: coordinator.py
+Created on: Oct 19, 2026
+Last modified on: Oct 19, 2026
+
+Comments:
+    Data coordinators and option handling for KCS TraceME N1Cx
+"""
+
+import time
+import asyncio
+import logging
+
+from datetime import timedelta
+from requests.exceptions import RequestException
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    CONF_DEV_EUI,
+    CONF_TEMPERATURE,
+    CONF_HUMIDITY,
+    CONF_PRESSURE,
+    CONF_AIR_QUALITY,
+    CONF_BATTERY,
+    CONF_ALL,
+    CONF_SCAN_INTERVAL,
+    CONF_MQTT,
+    CONF_MQTT_TOPIC,
+
+    DOMAIN,
+    DATA_COORDINATOR,
+    DATA_METRICS,
+    PLATFORM,
+
+    SIGNAL_DEVICE_ADDED,
+    SIGNAL_DEVICE_REMOVED,
+    SIGNAL_OPTIONS_UPDATED,
+
+    DEFAULT_DEV_EUI,
+    DEFAULT_TEMPERATURE,
+    DEFAULT_HUMIDITY,
+    DEFAULT_PRESSURE,
+    DEFAULT_AIR_QUALITY,
+    DEFAULT_BATTERY,
+    DEFAULT_ALL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MQTT,
+    DEFAULT_MQTT_TOPIC
+)
+from .kcs_n1cx import KCSTraceMeN1CxDataClient
+from .uplink import KCSTraceMeN1CxUplinkListener
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_devices(hass, entry):
+    """
+    Set up one data coordinator per configured DevEUI
+    :param hass: hass object
+    :param entry: config entry
+    :return: none
+    :raise HomeAssistantError: if the mqtt uplink subscriptions failed
+    """
+    # keep coordinators per DevEUI, so that option updates can be applied in place
+    devices = {}
+    entry_data = {
+        "devices": devices,
+        "uplink": None
+    }
+    hass.data[DOMAIN][DATA_COORDINATOR][entry.entry_id] = entry_data
+
+    for dev_eui in get_dev_euis(entry):
+        devices[dev_eui] = initialize_device(hass, entry, dev_eui)
+    await async_refresh_devices(entry, devices.values())
+
+    # subscribe to network server uplinks
+    await async_update_uplink(hass, entry, entry_data)
+
+
+async def async_unload_devices(hass, entry):
+    """
+    Drop the data coordinators and uplink subscriptions of a config entry
+    :param hass: hass object
+    :param entry: config entry
+    :return: none
+    """
+    entry_data = hass.data[DOMAIN][DATA_COORDINATOR].pop(entry.entry_id, None)
+    if entry_data is None:
+        return
+
+    if entry_data["uplink"] is not None:
+        entry_data["uplink"].async_unsubscribe()
+
+    for dev_eui in entry_data["devices"]:
+        hass.data[DOMAIN][DATA_METRICS].untrack(dev_eui)
+
+
+def initialize_device(hass, entry, dev_eui):
+    """
+    Initialize objects from KCS TraceME N1Cx API for a single device
+    The initial fetch is left to async_refresh_devices
+    :param hass: hass object
+    :param entry: config entry
+    :param dev_eui: LoraWAN DevEUI (HEX)
+    :return: data coordinator
+    """
+    api = KCSTraceMeN1CxDataClient(dev_eui)
+    metrics = hass.data[DOMAIN][DATA_METRICS]
+
+    # in-line function
+    async def async_update_data():
+        """
+        Fetch data from KCS TraceME N1Cx API
+        This is the place to pre-process the data to lookup tables so entities can quickly look up their data
+        :param: none
+        :return: json data decoded
+        """
+        # readings are pushed over mqtt, a poll still pending from before must not overwrite them
+        if get_mqtt_topics(entry):
+            return coordinator.data
+
+        data = None
+        start = time.monotonic()
+        try:
+            data = await hass.async_add_executor_job(decode_payload, api, entry)
+            return data
+        finally:
+            metrics.record_fetch(dev_eui, data is not None, time.monotonic() - start)
+
+    coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name=f"{PLATFORM} {dev_eui}",
+        update_method=async_update_data,
+        update_interval=get_scan_interval(entry)
+    )
+    metrics.track(dev_eui, coordinator)
+    return coordinator
+
+
+async def async_refresh_devices(entry, coordinators):
+    """
+    Fetch initial data of the given devices concurrently
+    :param entry: config entry
+    :param coordinators: data coordinators
+    :return: none
+    """
+    # fetch initial data so we have data when entities subscribe, mqtt uplinks fill it in otherwise
+    if get_mqtt_topics(entry):
+        return
+
+    await asyncio.gather(*[coordinator.async_refresh() for coordinator in coordinators])
+
+
+async def async_update_entry(hass, entry):
+    """
+    Apply updated options to the running coordinators and sensors
+    Only DevEUIs that were added trigger a fetch, and only for that device
+    :param hass: hass object
+    :param entry: config entry
+    :return: none
+    """
+    entry_data = hass.data[DOMAIN][DATA_COORDINATOR].get(entry.entry_id)
+    if entry_data is None:
+        return
+
+    devices = entry_data["devices"]
+    dev_euis = get_dev_euis(entry)
+    scan_interval = get_scan_interval(entry)
+
+    # drop the DevEUIs that are no longer configured, their sensors remove themselves
+    for dev_eui in [dev_eui for dev_eui in devices if dev_eui not in dev_euis]:
+        devices.pop(dev_eui)
+        hass.data[DOMAIN][DATA_METRICS].untrack(dev_eui)
+        async_dispatcher_send(hass, SIGNAL_DEVICE_REMOVED.format(dev_eui))
+        _LOGGER.debug(f"[{dev_eui}] Device removed")
+
+    # reconfigure the remaining coordinators and sensors without refetching,
+    # a new polling interval applies from the next scheduled refresh
+    for coordinator in devices.values():
+        resume = coordinator.update_interval is None and scan_interval is not None
+        coordinator.update_interval = scan_interval
+        if resume:
+            # polling only restarts with a refresh once mqtt ingestion is switched off
+            await coordinator.async_request_refresh()
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), get_options(entry))
+
+    # set up the newly configured DevEUIs, the sensor platform adds their sensors
+    added = [dev_eui for dev_eui in dev_euis if dev_eui not in devices]
+    for dev_eui in added:
+        devices[dev_eui] = initialize_device(hass, entry, dev_eui)
+    await async_refresh_devices(entry, [devices[dev_eui] for dev_eui in added])
+
+    for dev_eui in added:
+        async_dispatcher_send(hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), dev_eui)
+        _LOGGER.debug(f"[{dev_eui}] Device added")
+
+    # follow the DevEUI and topic changes on the network server subscriptions,
+    # a failed subscription is retried when the options are saved again
+    try:
+        await async_update_uplink(hass, entry, entry_data)
+    except HomeAssistantError as err:
+        _LOGGER.warning(f"[MQTT] Failed to subscribe: {str(err)}")
+
+
+async def async_update_uplink(hass, entry, entry_data):
+    """
+    Start, update or stop the mqtt uplink subscriptions of a config entry
+    :param hass: hass object
+    :param entry: config entry
+    :param entry_data: coordinators of the config entry
+    :return: none
+    :raise HomeAssistantError: if the MQTT client is not available
+    """
+    topics = get_mqtt_topics(entry)
+    uplink = entry_data["uplink"]
+
+    if not topics:
+        if uplink is not None:
+            uplink.async_unsubscribe()
+            entry_data["uplink"] = None
+        return
+
+    if uplink is None:
+        uplink = KCSTraceMeN1CxUplinkListener(hass, entry_data["devices"], hass.data[DOMAIN][DATA_METRICS])
+        entry_data["uplink"] = uplink
+
+    await uplink.async_subscribe(topics, get_dev_euis(entry))
+
+
+def get_config(config_entry):
+    """
+    Merge config entry data with its options, options take precedence
+    :param config_entry: config entry
+    :return: config values
+    """
+    config = dict(config_entry.data or {})
+    config.update({key: value for key, value in (config_entry.options or {}).items() if value is not None})
+    return config
+
+
+def get_dev_euis(config_entry):
+    """
+    Get the configured DevEUIs, a comma separated list is accepted
+    :param config_entry: config entry
+    :return: list of normalized DevEUIs
+    """
+    dev_euis = []
+    value = get_config(config_entry).get(CONF_DEV_EUI) or DEFAULT_DEV_EUI
+    for dev_eui in value.split(","):
+        dev_eui = dev_eui.strip().upper()
+        if dev_eui and dev_eui not in dev_euis:
+            dev_euis.append(dev_eui)
+
+    return dev_euis
+
+
+def get_primary_dev_eui(config_entry):
+    """
+    Get the DevEUI the config entry was created with
+    :param config_entry: config entry
+    :return: normalized DevEUI
+    """
+    value = (config_entry.data or {}).get(CONF_DEV_EUI) or DEFAULT_DEV_EUI
+    return value.split(",")[0].strip().upper()
+
+
+def get_options(config_entry):
+    """
+    Get attribute option flags
+    :param config_entry: config entry
+    :return: option flags
+    """
+    config = get_config(config_entry)
+
+    # entries whose options were never saved keep showing every attribute, as before the flags were honoured
+    default_all = DEFAULT_ALL if config_entry.options else True
+
+    return {
+        "temperature": config.get(CONF_TEMPERATURE, DEFAULT_TEMPERATURE),
+        "humidity": config.get(CONF_HUMIDITY, DEFAULT_HUMIDITY),
+        "pressure": config.get(CONF_PRESSURE, DEFAULT_PRESSURE),
+        "air_quality": config.get(CONF_AIR_QUALITY, DEFAULT_AIR_QUALITY),
+        "battery": config.get(CONF_BATTERY, DEFAULT_BATTERY),
+        "all": config.get(CONF_ALL, default_all)
+    }
+
+
+def get_scan_interval(config_entry):
+    """
+    Get polling interval
+    :param config_entry: config entry
+    :return: polling interval, none if readings are pushed over mqtt
+    """
+    if get_mqtt_topics(config_entry):
+        return None
+
+    return timedelta(seconds=get_config(config_entry).get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
+
+
+def get_mqtt_topics(config_entry):
+    """
+    Get network server uplink topics, a comma separated list is accepted
+    :param config_entry: config entry
+    :return: list of topic templates, empty if mqtt ingestion is disabled
+    """
+    config = get_config(config_entry)
+    if not config.get(CONF_MQTT, DEFAULT_MQTT):
+        return []
+
+    value = config.get(CONF_MQTT_TOPIC) or DEFAULT_MQTT_TOPIC
+    return [topic.strip() for topic in value.split(",") if topic.strip()]
+
+
+def decode_payload(api, config_entry):
+    """
+    List raw values from the given API
+    A failed fetch raises UpdateFailed, so the coordinator keeps the previous data
+    :param api: KCS TraceME N1Cx api client
+    :param config_entry: config entry
+    :return: data list in json format
+    """
+    # get sensor readings
+    try:
+        return api.parse_data()
+    except (ValueError, RequestException) as err:
+        raise UpdateFailed(f"[API] Error: {str(err)}") from err
@@ -1,7 +1,7 @@
 """
 Script file: kcs_n1cx.py
 Created on: Jan Oct 19, 2021
-Last modified on: Nov 5, 2021
+Last modified on: Oct 19, 2026
 
 Comments:
     KCS TraceME N1Cx data api functions
@@ -104,10 +104,22 @@ class KCSTraceMeN1CxDataClient:
         """
         # payload = self.get_valid_date(start, end)
         raw_data = self.call_api()
-        data_list = raw_data.splitlines()
+        if not isinstance(raw_data, str) or not raw_data.strip():
+            raise ValueError("No payload data received")
+
+        data_list = raw_data.strip().splitlines()
         last_data = data_list[-1]
         raw_payload = last_data.split()[-1]
 
+        return self.decode(raw_payload)
+
+    @staticmethod
+    def decode(raw_payload):
+        """
+        Decode a single FRMPayload published by the device.
+        :param raw_payload: FRMPayload in HEX
+        :return: decoded values
+        """
         # decode data
         payload = {
             "id": raw_payload[0:2],
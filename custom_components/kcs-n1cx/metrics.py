@@ -0,0 +1,221 @@
+"""
+Script file: metrics.py
+Created on: Oct 19, 2026
+Last modified on: Oct 19, 2026
+
+Comments:
+    OpenMetrics endpoint for KCS TraceME N1Cx readings and fetch health
+"""
+
+import time
+import logging
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import callback
+
+from .const import (
+    METRICS_URL,
+    METRICS_CONTENT_TYPE
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# (metric name, payload key, help text) of the decoded values
+READINGS = [
+    ("kcs_n1cx_co2_ppm", "co2", "CO2 gas concentration in PPM."),
+    ("kcs_n1cx_temperature_celsius", "temperature", "Temperature in degrees Celsius."),
+    ("kcs_n1cx_humidity_percent", "humidity", "Relative humidity in percent."),
+    ("kcs_n1cx_pressure_hpa", "pressure", "Air pressure in hPa."),
+    ("kcs_n1cx_air_quality", "air_quality", "Air quality index."),
+    ("kcs_n1cx_battery_volts", "battery", "Battery level in volts."),
+    ("kcs_n1cx_fw_version", "fw_version", "Firmware version."),
+]
+
+
+def escape_label(value):
+    """
+    Escape a label value for the OpenMetrics text format
+    :param value: label value
+    :return: escaped label value
+    """
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class KCSTraceMeN1CxMetrics:
+    """
+    Keeps the fetch health counters of every tracked DevEUI and
+    caches the rendered OpenMetrics text until a coordinator publishes new data.
+    """
+
+    def __init__(self):
+        """
+        Initialize metrics.
+        :param: none
+        :return: none
+        """
+        self._devices = {}
+        self._buffer = None
+
+    def track(self, dev_eui, coordinator):
+        """
+        Start exporting a device.
+        :param dev_eui: LoraWAN DevEUI (HEX)
+        :param coordinator: data coordinator object
+        :return: none
+        """
+        self.untrack(dev_eui)
+        self._devices[dev_eui] = {
+            "coordinator": coordinator,
+            "unsub": coordinator.async_add_listener(self.invalidate),
+            "success": 0,
+            "failure": 0,
+            "uplinks": 0,
+            "duration": None,
+            "last_success": None
+        }
+        self.invalidate()
+
+    def untrack(self, dev_eui):
+        """
+        Stop exporting a device.
+        :param dev_eui: LoraWAN DevEUI (HEX)
+        :return: none
+        """
+        device = self._devices.pop(dev_eui, None)
+        if device is not None:
+            device["unsub"]()
+            self.invalidate()
+
+    def record_fetch(self, dev_eui, success, duration):
+        """
+        Count an HTTP fetch, published with the next coordinator update.
+        :param dev_eui: LoraWAN DevEUI (HEX)
+        :param success: true if the payload was decoded
+        :param duration: fetch duration in seconds
+        :return: none
+        """
+        device = self._devices.get(dev_eui)
+        if device is None:
+            return
+
+        device["duration"] = duration
+        if success:
+            device["success"] += 1
+            device["last_success"] = time.time()
+        else:
+            device["failure"] += 1
+
+    def record_uplink(self, dev_eui):
+        """
+        Count an mqtt uplink, published with the next coordinator update.
+        :param dev_eui: LoraWAN DevEUI (HEX)
+        :return: none
+        """
+        device = self._devices.get(dev_eui)
+        if device is None:
+            return
+
+        device["uplinks"] += 1
+        device["last_success"] = time.time()
+
+    @callback
+    def invalidate(self):
+        """
+        Drop the rendered buffer.
+        :param: none
+        :return: none
+        """
+        self._buffer = None
+
+    def render(self):
+        """
+        Return the OpenMetrics text, rendered only if it was invalidated.
+        :param: none
+        :return: encoded metrics
+        """
+        if self._buffer is None:
+            self._buffer = self._render().encode("utf-8")
+
+        return self._buffer
+
+    def _render(self):
+        """
+        Render all tracked devices in the OpenMetrics text format.
+        :param: none
+        :return: metrics text
+        """
+        devices = sorted(self._devices.items())
+        lines = []
+
+        def add_family(name, metric_type, help_text, samples):
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.extend(samples)
+
+        # decoded values
+        for name, key, help_text in READINGS:
+            samples = []
+            for dev_eui, device in devices:
+                data = device["coordinator"].data
+                if data and data.get(key) is not None:
+                    samples.append(f"{name}{{dev_eui=\"{escape_label(dev_eui)}\"}} {data[key]}")
+            add_family(name, "gauge", help_text, samples)
+
+        # fetch health
+        add_family("kcs_n1cx_up", "gauge", "Whether the last coordinator update succeeded.", [
+            f"kcs_n1cx_up{{dev_eui=\"{escape_label(dev_eui)}\"}} {int(device['coordinator'].last_update_success)}"
+            for dev_eui, device in devices
+        ])
+
+        samples = []
+        for dev_eui, device in devices:
+            for result in ["success", "failure"]:
+                samples.append(
+                    f"kcs_n1cx_fetches_total{{dev_eui=\"{escape_label(dev_eui)}\",result=\"{result}\"}} {device[result]}"
+                )
+        add_family("kcs_n1cx_fetches", "counter", "HTTP payload fetches by result.", samples)
+
+        add_family("kcs_n1cx_uplinks", "counter", "MQTT uplinks received.", [
+            f"kcs_n1cx_uplinks_total{{dev_eui=\"{escape_label(dev_eui)}\"}} {device['uplinks']}"
+            for dev_eui, device in devices
+        ])
+
+        add_family("kcs_n1cx_fetch_duration_seconds", "gauge", "Duration of the last HTTP payload fetch.", [
+            f"kcs_n1cx_fetch_duration_seconds{{dev_eui=\"{escape_label(dev_eui)}\"}} {device['duration']:.3f}"
+            for dev_eui, device in devices if device["duration"] is not None
+        ])
+
+        add_family("kcs_n1cx_last_success_timestamp_seconds", "gauge", "Time of the last decoded reading.", [
+            f"kcs_n1cx_last_success_timestamp_seconds{{dev_eui=\"{escape_label(dev_eui)}\"}} {device['last_success']:.3f}"
+            for dev_eui, device in devices if device["last_success"] is not None
+        ])
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class KCSTraceMeN1CxMetricsView(HomeAssistantView):
+    """Serve KCS TraceME N1Cx metrics in the OpenMetrics text format"""
+
+    url = METRICS_URL
+    name = "api:kcs_n1cx:metrics"
+
+    def __init__(self, metrics):
+        """
+        Initialize metrics view
+        :param metrics: metrics object
+        :return: none
+        """
+        self._metrics = metrics
+
+    async def get(self, request):
+        """
+        Handle a scrape
+        :param request: http request
+        :return: metrics response
+        """
+        return web.Response(
+            body=self._metrics.render(),
+            headers={"Content-Type": METRICS_CONTENT_TYPE}
+        )
@@ -1,7 +1,7 @@
 """
 Script file: sensor.py
 Created on: Oct 19, 2021
-Last modified on: Nov 8, 2021
+Last modified on: Oct 19, 2026
 
 Comments:
     Support for KCS TraceME N1Cx sensor
@@ -9,39 +9,28 @@ Comments:
 
 import logging
 
-from datetime import datetime, timedelta
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from homeassistant.const import(
     ATTR_ATTRIBUTION,
     CONF_NAME
 )
 from .const import (
-    CONF_DEV_EUI,
-    CONF_GAS,
-    CONF_TEMPERATURE,
-    CONF_HUMIDITY,
-    CONF_PRESSURE,
-    CONF_AIR_QUALITY,
-    CONF_BATTERY,
-    CONF_ALL,
-
-    PLATFORM,
+    DOMAIN,
+    DATA_COORDINATOR,
     ATTRIBUTION,
     SENSOR_TYPE,
     ICON,
 
+    SIGNAL_DEVICE_ADDED,
+    SIGNAL_DEVICE_REMOVED,
+    SIGNAL_OPTIONS_UPDATED,
+
     DEFAULT_NAME,
-    DEFAULT_DEV_EUI,
-    DEFAULT_GAS,
     DEFAULT_DEVICE_TYPE,
-    DEFAULT_TEMPERATURE,
-    DEFAULT_HUMIDITY,
-    DEFAULT_PRESSURE,
-    DEFAULT_AIR_QUALITY,
-    DEFAULT_BATTERY,
-    DEFAULT_ALL,
 
     ATTR_DEVICE_TYPE,
     ATTR_TEMPERATURE,
@@ -50,10 +39,11 @@ from .const import (
     ATTR_AIR_QUALITY,
     ATTR_BATTERY
 )
-from .kcs_n1cx import KCSTraceMeN1CxDataClient
+from .coordinator import (
+    get_options,
+    get_primary_dev_eui
+)
 
-# set scan interval as 10 mins
-SCAN_INTERVAL = timedelta(seconds=600)
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -64,62 +54,53 @@ async def async_setup_entry(hass, entry, async_add_entities):
     :param entry: config entry
     :return: none
     """
+    devices = hass.data[DOMAIN][DATA_COORDINATOR][entry.entry_id]["devices"]
+
     # in-line function
-    async def async_update_data():
+    @callback
+    def async_add_device(dev_eui):
         """
-        Fetch data from KCS TraceME N1Cx API
-        This is the place to pre-process the data to lookup tables so entities can quickly look up their data
-        :param: none
-        :return: json data decoded
+        Add the sensor of a DevEUI configured through the options
+        :param dev_eui: LoraWAN DevEUI (HEX)
+        :return: none
         """
-        return await hass.async_add_executor_job(decode_payload, api, entry)
+        async_add_entities([create_sensor(entry, dev_eui, devices[dev_eui])], False)
 
-    async def async_initialize():
-        """
-        Initialize objects from KCS TraceME N1Cx API
-        :param: none
-        :return: data coordinator, device type
-        """
-        coordinator = DataUpdateCoordinator(
-            hass,
-            _LOGGER,
-            name=PLATFORM,
-            update_method=async_update_data
-        )
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICE_ADDED.format(entry.entry_id), async_add_device)
+    )
 
-        # fetch initial data so we have data when entities subscribe
-        sensor_name, device_type = await hass.async_add_executor_job(get_device_info, api, entry)
-        await coordinator.async_refresh()
-        return (coordinator, sensor_name, device_type)
-
-    # initialize KCS TraceME N1Cx API
-    dev_eui = None
-    if entry.data:
-        dev_eui = entry.data.get(CONF_DEV_EUI, DEFAULT_DEV_EUI)
-
-    api = KCSTraceMeN1CxDataClient(dev_eui)
-    coordinator, sensor_name, device_type = await async_initialize()
-
-    # get options
-    options = None
-    if entry.data:
-        options = {
-            "temperature": entry.data.get(CONF_TEMPERATURE, DEFAULT_TEMPERATURE),
-            "humidity": entry.data.get(CONF_HUMIDITY, DEFAULT_HUMIDITY),
-            "pressure": entry.data.get(CONF_PRESSURE, DEFAULT_PRESSURE),
-            "air_quality": entry.data.get(CONF_AIR_QUALITY, DEFAULT_AIR_QUALITY),
-            "battery": entry.data.get(CONF_BATTERY, DEFAULT_BATTERY),
-            "all": entry.data.get(CONF_ALL, DEFAULT_ALL)
-        }
+    # add sensors
+    async_add_entities(
+        [create_sensor(entry, dev_eui, coordinator) for dev_eui, coordinator in devices.items()],
+        False
+    )
 
-    # add sensor
-    async_add_entities([KCSTraceMeN1CxSensor(coordinator, sensor_name, device_type, options)], False)
+
+def create_sensor(entry, dev_eui, coordinator):
+    """
+    Create the sensor of a single device
+    :param entry: config entry
+    :param dev_eui: LoraWAN DevEUI (HEX)
+    :param coordinator: data coordinator object
+    :return: sensor
+    """
+    sensor_name, device_type = get_device_info(entry)
+
+    # the DevEUI given at setup keeps the original unique id and name
+    unique_id = SENSOR_TYPE
+    if dev_eui != get_primary_dev_eui(entry):
+        unique_id = f"{SENSOR_TYPE}_{dev_eui.lower()}"
+        sensor_name = f"{sensor_name} {dev_eui}"
+
+    return KCSTraceMeN1CxSensor(
+        coordinator, sensor_name, device_type, get_options(entry), unique_id, entry.entry_id, dev_eui
+    )
 
 
-def get_device_info(api, config_entry):
+def get_device_info(config_entry):
     """
     Get sensor information
-    :param api: KCS TraceME N1Cx client
     :param config_entry: config entry
     :return: (device name, smarte meter type)
     """
@@ -134,37 +115,25 @@ def get_device_info(api, config_entry):
     return (sensor_name, device_type)
 
 
-def decode_payload(api, config_entry):
-    """
-    List raw values from the given API
-    :param api: KCS TraceME N1Cx api client
-    :param config_entry: config entry
-    :return: data list in json format
-    """
-    # get sensor readings
-    data = None
-    try:
-        data = api.parse_data()
-    except ValueError as err:
-        _LOGGER.warning(f"[API] Error: {str(err)}")
-    finally:
-        return data
-
-
 class KCSTraceMeN1CxSensor(Entity):
     """Implementation of a sensor"""
 
-    def __init__(self, coordinator, sensor_name, device_type, options):
+    def __init__(self, coordinator, sensor_name, device_type, options, unique_id, entry_id, dev_eui):
         """
         Initialize sensor class
         :param coordinator: data coordinator object
         :param sensor_name: device name
         :param device_type: device type
         :param options: option flags
+        :param unique_id: sensor unique id
+        :param entry_id: config entry id
+        :param dev_eui: LoraWAN DevEUI (HEX)
         :return: none
         """
+        self._entry_id = entry_id
+        self._dev_eui = dev_eui
         self._name = sensor_name
-        self._type = SENSOR_TYPE
+        self._type = unique_id
         self._state = None
         self._coordinator = coordinator
         self._device_type = DEFAULT_DEVICE_TYPE
@@ -222,15 +191,15 @@ class KCSTraceMeN1CxSensor(Entity):
     @property
     def should_poll(self):
         """
-        Need to poll.
+        No need to poll.
         Coordinator notifies entity of updates
         :param: none
         :return: false
         """
-        return True
+        return False
 
     @property
-    def device_state_attributes(self):
+    def extra_state_attributes(self):
         """
         Return the state attributes
         :param: none
@@ -242,23 +211,17 @@ class KCSTraceMeN1CxSensor(Entity):
         }
 
         if self._coordinator.data and self._options:
-            """
-            if self._options.get('temperature'):
-                attributes[ATTR_TEMPERATURE] = f"{self._coordinator.data.get('temperature'):.2f} °C",
-            if self._options.get('humidity'):
+            show_all = self._options.get('all')
+            if show_all or self._options.get('temperature'):
+                attributes[ATTR_TEMPERATURE] = f"{self._coordinator.data.get('temperature'):.2f} °C"
+            if show_all or self._options.get('humidity'):
                 attributes[ATTR_HUMIDITY] = f"{self._coordinator.data.get('humidity'):.2f} %"
-            if self._options.get('pressure'):
+            if show_all or self._options.get('pressure'):
                 attributes[ATTR_PRESSURE] = f"{self._coordinator.data.get('pressure'):.2f} hPa"
-            if self._options.get('air_quality'):
+            if show_all or self._options.get('air_quality'):
                 attributes[ATTR_AIR_QUALITY] = self._coordinator.data.get('air_quality')
-            if self._options.get('battery'):
+            if show_all or self._options.get('battery'):
                 attributes[ATTR_BATTERY] = f"{self._coordinator.data.get('battery'):.3f} V"
-            """
-            attributes[ATTR_TEMPERATURE] = f"{self._coordinator.data.get('temperature'):.2f} °C",
-            attributes[ATTR_HUMIDITY] = f"{self._coordinator.data.get('humidity'):.2f} %"
-            attributes[ATTR_PRESSURE] = f"{self._coordinator.data.get('pressure'):.2f} hPa"
-            attributes[ATTR_AIR_QUALITY] = self._coordinator.data.get('air_quality')
-            attributes[ATTR_BATTERY] = f"{self._coordinator.data.get('battery'):.3f} V"
 
         return attributes
 
@@ -282,6 +245,40 @@ class KCSTraceMeN1CxSensor(Entity):
             value = self._coordinator.data.get('co2')
             self._state = f"{value:.2f}"
 
+    @callback
+    def update_options(self, options):
+        """
+        Apply new option flags without refetching data
+        :param options: option flags
+        :return: none
+        """
+        self._options = options
+        self.async_write_ha_state()
+
+    @callback
+    def handle_device_removed(self):
+        """
+        Remove the sensor when its DevEUI is dropped from the options
+        :param: none
+        :return: none
+        """
+        registry = entity_registry.async_get(self.hass)
+        if registry.async_get(self.entity_id):
+            # removing the registry entry also removes the entity
+            registry.async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove())
+
+    @callback
+    def handle_coordinator_update(self):
+        """
+        Refresh the state when the coordinator publishes new data
+        :param: none
+        :return: none
+        """
+        self.update_state()
+        self.async_write_ha_state()
+
     async def async_added_to_hass(self):
         """
         When entity is added to hass
@@ -289,7 +286,13 @@ class KCSTraceMeN1CxSensor(Entity):
         :return: none
         """
         self.async_on_remove(
-            self._coordinator.async_add_listener(self.async_write_ha_state)
+            self._coordinator.async_add_listener(self.handle_coordinator_update)
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_OPTIONS_UPDATED.format(self._entry_id), self.update_options)
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_DEVICE_REMOVED.format(self._dev_eui), self.handle_device_removed)
         )
         self.update_state()
 
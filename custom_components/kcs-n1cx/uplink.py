@@ -0,0 +1,190 @@
+"""
+Script file: uplink.py
+Created on: Oct 19, 2026
+Last modified on: Oct 19, 2026
+
+Comments:
+    MQTT uplink ingestion from a LoRaWAN network server (ChirpStack/TTN)
+"""
+
+import re
+import json
+import base64
+import binascii
+import logging
+
+from homeassistant.components import mqtt
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import MQTT_BATCH_DELAY
+from .kcs_n1cx import KCSTraceMeN1CxDataClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# chirpstack topics carry the DevEUI, e.g. application/1/device/7cc6c42900010851/rx
+CHIRPSTACK_TOPIC = re.compile(r'application/[^/]+/device/([0-9A-Fa-f]{16})/')
+DEV_EUI = re.compile(r'^[0-9A-Fa-f]{16}$')
+
+
+def get_uplink_payload(topic, message):
+    """
+    Extract DevEUI and FRMPayload from a network server uplink message.
+    Supports ChirpStack v3 (rx), ChirpStack v4 (event/up) and TTN v3 (up) JSON messages.
+    :param topic: mqtt topic
+    :param message: mqtt payload (JSON)
+    :return: (DevEUI, FRMPayload in HEX), (None, None) if the message is not an uplink
+    """
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return (None, None)
+
+    if not isinstance(data, dict):
+        return (None, None)
+
+    # DevEUI, chirpstack topics carry it in HEX while its v3 json marshaler publishes base64
+    match = CHIRPSTACK_TOPIC.match(topic)
+    if match:
+        dev_eui = match.group(1)
+    else:
+        dev_eui = (
+            data.get("devEUI")
+            or (data.get("deviceInfo") or {}).get("devEui")
+            or (data.get("end_device_ids") or {}).get("dev_eui")
+        )
+        if not isinstance(dev_eui, str) or not DEV_EUI.match(dev_eui):
+            return (None, None)
+
+    # FRMPayload
+    frm_payload = data.get("data")
+    if frm_payload is None:
+        frm_payload = (data.get("uplink_message") or {}).get("frm_payload")
+
+    if not isinstance(frm_payload, str) or not frm_payload:
+        return (None, None)
+
+    # network servers publish the FRMPayload base64 encoded
+    try:
+        frm_payload = base64.b64decode(frm_payload, validate=True).hex()
+    except (binascii.Error, ValueError):
+        return (None, None)
+
+    return (dev_eui.upper(), frm_payload)
+
+
+class KCSTraceMeN1CxUplinkListener:
+    """
+    Subscribes to network server uplink topics and pushes decoded
+    readings to the coordinators of the configured DevEUIs.
+    """
+
+    def __init__(self, hass, devices, metrics):
+        """
+        Initialize uplink listener.
+        :param hass: hass object
+        :param devices: coordinators keyed by DevEUI
+        :param metrics: metrics object
+        :return: none
+        """
+        self._hass = hass
+        self._devices = devices
+        self._metrics = metrics
+        self._pending = {}
+        self._unsub_flush = None
+        self._unsub_topics = []
+        self._subscribed = None
+
+    async def async_subscribe(self, topics, dev_euis):
+        """
+        (Re)subscribe to the uplink topics of the given DevEUIs.
+        :param topics: topic templates, `{dev_eui}` is replaced by each DevEUI
+        :param dev_euis: list of DevEUIs
+        :return: none
+        :raise HomeAssistantError: if the MQTT client is not available, nothing is left subscribed then
+        """
+        if self._subscribed == (tuple(topics), tuple(dev_euis)):
+            return
+
+        self.async_unsubscribe()
+
+        if not await mqtt.async_wait_for_mqtt_client(self._hass):
+            raise HomeAssistantError("MQTT integration is not available")
+
+        subscriptions = []
+        for topic in topics:
+            if "{dev_eui}" in topic:
+                subscriptions.extend(topic.format(dev_eui=dev_eui.lower()) for dev_eui in dev_euis)
+            else:
+                subscriptions.append(topic)
+
+        try:
+            for topic in dict.fromkeys(subscriptions):
+                self._unsub_topics.append(
+                    await mqtt.async_subscribe(self._hass, topic, self.handle_message)
+                )
+                _LOGGER.debug(f"[MQTT] Subscribed to {topic}")
+        except HomeAssistantError:
+            self.async_unsubscribe()
+            raise
+
+        # only a complete subscription is skipped when the same options are saved again
+        self._subscribed = (tuple(topics), tuple(dev_euis))
+
+    @callback
+    def async_unsubscribe(self):
+        """
+        Unsubscribe from all topics and drop pending readings.
+        :param: none
+        :return: none
+        """
+        while self._unsub_topics:
+            self._unsub_topics.pop()()
+
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._pending = {}
+        self._subscribed = None
+
+    @callback
+    def handle_message(self, msg):
+        """
+        Decode an uplink and queue it for the next batch.
+        :param msg: mqtt message
+        :return: none
+        """
+        dev_eui, frm_payload = get_uplink_payload(msg.topic, msg.payload)
+        if dev_eui not in self._devices:
+            return
+
+        try:
+            data = KCSTraceMeN1CxDataClient.decode(frm_payload)
+        except ValueError as err:
+            _LOGGER.warning(f"[MQTT] Error: {str(err)}")
+            return
+
+        self._metrics.record_uplink(dev_eui)
+
+        # only the latest reading of each device is kept until the batch is flushed
+        self._pending[dev_eui] = data
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self._hass, MQTT_BATCH_DELAY, self.flush)
+
+    @callback
+    def flush(self, _now=None):
+        """
+        Push the queued readings to their coordinators.
+        :param _now: time of the scheduled call
+        :return: none
+        """
+        self._unsub_flush = None
+        pending, self._pending = self._pending, {}
+
+        for dev_eui, data in pending.items():
+            coordinator = self._devices.get(dev_eui)
+            if coordinator is not None:
+                coordinator.async_set_updated_data(data)
+
+        _LOGGER.debug(f"[MQTT] Updated {len(pending)} device(s)")
@@ -0,0 +1 @@
+"""Tests for the KCS TraceME N1Cx integration."""
@@ -0,0 +1,21 @@
+"""Fixtures for the KCS TraceME N1Cx integration tests."""
+
+import pytest
+
+# import the repository's custom_components before home assistant mounts its testing config
+import custom_components
+
+from homeassistant import loader
+
+# the integration lives in custom_components/kcs-n1cx, HACS installs it as custom_components/kcs_n1cx
+INTEGRATION_DIR = "kcs-n1cx"
+DOMAIN = "kcs_n1cx"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(hass, enable_custom_integrations):
+    """Make the integration resolvable under its domain."""
+    hass.data[loader.DATA_CUSTOM_COMPONENTS] = {
+        DOMAIN: loader.Integration.resolve_from_root(hass, custom_components, INTEGRATION_DIR)
+    }
+    yield
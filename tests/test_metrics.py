@@ -0,0 +1,51 @@
+"""Tests for the KCS TraceME N1Cx OpenMetrics endpoint."""
+
+import importlib
+
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+const = importlib.import_module("custom_components.kcs-n1cx.const")
+kcs_n1cx = importlib.import_module("custom_components.kcs-n1cx.kcs_n1cx")
+
+DEV_EUI = "7CC6C42900010851"
+
+
+async def test_failed_fetch_reported_down(hass, hass_client):
+    """A failed fetch marks the device down and keeps its previous readings."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"}
+    )
+    entry.add_to_hass(hass)
+
+    polled = kcs_n1cx.KCSTraceMeN1CxDataClient.decode("0a1c2b01f42a320100001234c35001ff")
+    with patch.object(kcs_n1cx.KCSTraceMeN1CxDataClient, "call_api", return_value=f"2026-10-19 {DEV_EUI} 0a1c2b01f42a320100001234c35001ff"):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    client = await hass_client()
+    response = await client.get(const.METRICS_URL)
+    assert response.status == 200
+    assert response.headers["Content-Type"] == const.METRICS_CONTENT_TYPE
+    text = await response.text()
+    assert f'kcs_n1cx_co2_ppm{{dev_eui="{DEV_EUI}"}} {polled["co2"]}' in text
+    assert f'kcs_n1cx_up{{dev_eui="{DEV_EUI}"}} 1' in text
+    assert f'kcs_n1cx_fetches_total{{dev_eui="{DEV_EUI}",result="success"}} 1' in text
+    assert text.endswith("# EOF\n")
+
+    # the log download fails, call_api returns none
+    coordinator = hass.data[const.DOMAIN][const.DATA_COORDINATOR][entry.entry_id]["devices"][DEV_EUI]
+    with patch.object(kcs_n1cx.KCSTraceMeN1CxDataClient, "call_api", return_value=None):
+        await coordinator.async_refresh()
+
+    text = await (await client.get(const.METRICS_URL)).text()
+    assert f'kcs_n1cx_up{{dev_eui="{DEV_EUI}"}} 0' in text
+    assert f'kcs_n1cx_fetches_total{{dev_eui="{DEV_EUI}",result="failure"}} 1' in text
+    assert f'kcs_n1cx_co2_ppm{{dev_eui="{DEV_EUI}"}} {polled["co2"]}' in text
+    assert hass.states.get("sensor.co2").state == "unavailable"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,162 @@
+"""Tests for applying KCS TraceME N1Cx option changes in place."""
+
+import asyncio
+import importlib
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.helpers import entity_registry
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+const = importlib.import_module("custom_components.kcs-n1cx.const")
+kcs_n1cx = importlib.import_module("custom_components.kcs-n1cx.kcs_n1cx")
+
+DEV_EUI = "7CC6C42900010851"
+DEV_EUI_2 = "7CC6C42900010852"
+PAYLOAD = "0a1c2b01f42a320100001234c35001ff"
+ATTRIBUTES = ["Temperature", "Humidity", "Pressure", "Air Quality", "Battery"]
+
+
+def url(dev_eui):
+    """Return the payload log URL of a DevEUI."""
+    return kcs_n1cx.KCSTraceMeN1CxDataClient(dev_eui).url
+
+
+@pytest.fixture
+def fetched():
+    """Record the URLs fetched by the api clients."""
+    urls = []
+
+    def call_api(api, tag=None):
+        urls.append(api.url)
+        return f"2026-10-19 {PAYLOAD}"
+
+    with patch.object(kcs_n1cx.KCSTraceMeN1CxDataClient, "call_api", autospec=True, side_effect=call_api):
+        yield urls
+
+
+@pytest.fixture(autouse=True)
+async def unload_entries(hass):
+    """Unload the config entries, stopping their polling."""
+    yield
+    for entry in hass.config_entries.async_entries(const.DOMAIN):
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def setup_entry(hass, options=None):
+    """Set up a config entry for the primary DevEUI."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"},
+        options=options or {}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def update_options(hass, entry, **options):
+    """Save new options and wait for them to be applied."""
+    hass.config_entries.async_update_entry(entry, options={**entry.options, **options})
+    await hass.async_block_till_done()
+
+
+async def test_add_dev_eui_fetches_only_new_device(hass, fetched):
+    """Adding a DevEUI fetches that device only and adds its sensor."""
+    entry = await setup_entry(hass)
+    assert fetched == [url(DEV_EUI)]
+
+    await update_options(hass, entry, dev_eui=f"{DEV_EUI}, {DEV_EUI_2}")
+
+    assert fetched == [url(DEV_EUI), url(DEV_EUI_2)]
+    assert hass.states.get("sensor.co2").state == "500.00"
+    assert hass.states.get(f"sensor.co2_{DEV_EUI_2.lower()}").state == "500.00"
+
+
+async def test_initial_fetches_run_concurrently(hass, fetched):
+    """A stalled device does not hold back the first fetch of the others."""
+    started = []
+    all_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def async_refresh(coordinator):
+        started.append(coordinator.name)
+        if len(started) == 2:
+            all_started.set()
+        await release.wait()
+
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: f"{DEV_EUI}, {DEV_EUI_2}", const.CONF_GAS: True, "name": "CO2"}
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "homeassistant.helpers.update_coordinator.DataUpdateCoordinator.async_refresh", autospec=True,
+        side_effect=async_refresh
+    ):
+        setup = hass.async_create_task(hass.config_entries.async_setup(entry.entry_id))
+        await asyncio.wait_for(all_started.wait(), 1)
+        release.set()
+        assert await setup
+
+    await hass.async_block_till_done()
+
+
+async def test_remove_dev_eui_removes_only_its_sensor(hass, fetched):
+    """Removing a DevEUI removes its sensor and registry entry without a fetch."""
+    entry = await setup_entry(hass, {const.CONF_DEV_EUI: f"{DEV_EUI}, {DEV_EUI_2}"})
+    registry = entity_registry.async_get(hass)
+    removed = f"sensor.co2_{DEV_EUI_2.lower()}"
+    assert registry.async_get(removed) is not None
+    fetched.clear()
+
+    await update_options(hass, entry, dev_eui=DEV_EUI)
+
+    assert fetched == []
+    assert hass.states.get(removed) is None
+    assert registry.async_get(removed) is None
+    assert hass.states.get("sensor.co2").state == "500.00"
+    assert registry.async_get("sensor.co2") is not None
+
+
+async def test_toggle_attributes_without_fetch(hass, fetched):
+    """Attribute flags re-render the sensor without a fetch."""
+    entry = await setup_entry(hass, {const.CONF_ALL: False})
+    assert not set(ATTRIBUTES) & set(hass.states.get("sensor.co2").attributes)
+    fetched.clear()
+
+    await update_options(hass, entry, temperature=True, battery=True)
+
+    assert fetched == []
+    attributes = hass.states.get("sensor.co2").attributes
+    assert "Temperature" in attributes
+    assert "Battery" in attributes
+    assert "Humidity" not in attributes
+
+
+async def test_scan_interval_moved_onto_coordinators(hass, fetched):
+    """A new polling interval is applied to the running coordinators without a fetch."""
+    entry = await setup_entry(hass, {const.CONF_DEV_EUI: f"{DEV_EUI}, {DEV_EUI_2}"})
+    devices = hass.data[const.DOMAIN][const.DATA_COORDINATOR][entry.entry_id]["devices"]
+    fetched.clear()
+
+    await update_options(hass, entry, scan_interval=120)
+
+    assert fetched == []
+    assert [coordinator.update_interval for coordinator in devices.values()] == [timedelta(seconds=120)] * 2
+
+
+async def test_no_saved_options_keep_all_attributes(hass, fetched):
+    """Entries whose options were never saved show every attribute."""
+    await setup_entry(hass)
+
+    attributes = hass.states.get("sensor.co2").attributes
+    assert set(ATTRIBUTES) <= set(attributes)
@@ -0,0 +1,238 @@
+"""Tests for the KCS TraceME N1Cx MQTT uplink ingestion."""
+
+import json
+import base64
+import importlib
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+    async_fire_time_changed
+)
+
+const = importlib.import_module("custom_components.kcs-n1cx.const")
+uplink = importlib.import_module("custom_components.kcs-n1cx.uplink")
+kcs_n1cx = importlib.import_module("custom_components.kcs-n1cx.kcs_n1cx")
+
+DEV_EUI = "7CC6C42900010851"
+DEV_EUI_2 = "7CC6C42900010852"
+TTN_TOPIC = "v3/kcs@ttn/devices/kcs-n1cx/up"
+
+
+def frm_payload(co2):
+    """Return a base64 FRMPayload reporting the given CO2 PPM."""
+    return base64.b64encode(bytes.fromhex(f"0a1c2b{co2:04x}2a320100001234c35001ff")).decode()
+
+
+def ttn_message(dev_eui, co2):
+    """Return a TTN v3 uplink message."""
+    return json.dumps({
+        "end_device_ids": {"device_id": "kcs-n1cx", "dev_eui": dev_eui},
+        "uplink_message": {"f_port": 1, "frm_payload": frm_payload(co2)}
+    })
+
+
+@pytest.fixture
+async def config_entry(hass, mqtt_mock):
+    """Set up the integration with mqtt ingestion for two devices."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"},
+        options={const.CONF_MQTT: True, const.CONF_DEV_EUI: f"{DEV_EUI}, {DEV_EUI_2}"}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def flush_batch(hass):
+    """Fire the batch timer."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=const.MQTT_BATCH_DELAY + 1))
+    await hass.async_block_till_done()
+
+
+def test_get_uplink_payload_chirpstack_v3():
+    """ChirpStack v3 publishes the DevEUI base64 encoded, the topic carries it in HEX."""
+    message = json.dumps({"devEUI": "fMbEKQABCFE=", "fPort": 1, "data": frm_payload(1000)})
+    dev_eui, payload = uplink.get_uplink_payload(f"application/1/device/{DEV_EUI.lower()}/rx", message)
+
+    assert dev_eui == DEV_EUI
+    assert payload == "0a1c2b03e82a320100001234c35001ff"
+
+
+def test_get_uplink_payload_chirpstack_v4():
+    """ChirpStack v4 event/up messages are decoded."""
+    message = json.dumps({"deviceInfo": {"devEui": DEV_EUI.lower()}, "fPort": 1, "data": frm_payload(1000)})
+    dev_eui, payload = uplink.get_uplink_payload(f"application/abc/device/{DEV_EUI.lower()}/event/up", message)
+
+    assert dev_eui == DEV_EUI
+    assert payload == "0a1c2b03e82a320100001234c35001ff"
+
+
+def test_get_uplink_payload_ttn():
+    """TTN v3 up messages carry the DevEUI in the payload only."""
+    dev_eui, payload = uplink.get_uplink_payload(TTN_TOPIC, ttn_message(DEV_EUI, 1000))
+
+    assert dev_eui == DEV_EUI
+    assert payload == "0a1c2b03e82a320100001234c35001ff"
+
+
+@pytest.mark.parametrize("message", [
+    json.dumps({"end_device_ids": {"dev_eui": 123}, "uplink_message": {"frm_payload": frm_payload(1000)}}),
+    json.dumps({"end_device_ids": {"dev_eui": "fMbEKQABCFE="}, "uplink_message": {"frm_payload": frm_payload(1000)}}),
+    json.dumps({"end_device_ids": {"dev_eui": DEV_EUI}, "uplink_message": {"frm_payload": "not base64!"}}),
+    json.dumps({"end_device_ids": {"dev_eui": DEV_EUI}}),
+    json.dumps([1, 2, 3]),
+    "not json",
+])
+def test_get_uplink_payload_invalid(message):
+    """Messages without a valid DevEUI and FRMPayload are ignored."""
+    assert uplink.get_uplink_payload(TTN_TOPIC, message) == (None, None)
+
+
+async def test_uplink_updates_sensor(hass, config_entry):
+    """An uplink of a configured DevEUI updates its sensor after the batch delay."""
+    async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message(DEV_EUI, 1000))
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.co2").state == "unknown"
+
+    await flush_batch(hass)
+    assert hass.states.get("sensor.co2").state == "1000.00"
+
+
+async def test_uplink_filtered_by_dev_eui(hass, config_entry):
+    """Uplinks of DevEUIs that are not configured are dropped."""
+    with patch.object(DataUpdateCoordinator, "async_set_updated_data") as set_updated_data:
+        async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message("0000000000000001", 1000))
+        await flush_batch(hass)
+
+    set_updated_data.assert_not_called()
+
+
+async def test_uplink_burst_is_batched(hass, config_entry):
+    """A burst of uplinks results in one update per device with its latest reading."""
+    with patch.object(DataUpdateCoordinator, "async_set_updated_data", autospec=True) as set_updated_data:
+        for co2 in range(400, 410):
+            async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message(DEV_EUI, co2))
+            async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message(DEV_EUI_2, co2 + 100))
+        await hass.async_block_till_done()
+        set_updated_data.assert_not_called()
+
+        await flush_batch(hass)
+
+    assert set_updated_data.call_count == 2
+    devices = hass.data[const.DOMAIN][const.DATA_COORDINATOR][config_entry.entry_id]["devices"]
+    updates = {call.args[0]: call.args[1]["co2"] for call in set_updated_data.call_args_list}
+    assert updates == {devices[DEV_EUI]: 409, devices[DEV_EUI_2]: 509}
+
+
+async def test_unsubscribe_on_unload(hass, config_entry):
+    """Unloading the entry unsubscribes from the uplink topics."""
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    with patch.object(DataUpdateCoordinator, "async_set_updated_data") as set_updated_data:
+        async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message(DEV_EUI, 1000))
+        await flush_batch(hass)
+
+    set_updated_data.assert_not_called()
+
+
+async def test_enabling_mqtt_stops_polling(hass, mqtt_mock):
+    """A poll scheduled before mqtt ingestion was enabled does not fetch over HTTP."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"}
+    )
+    entry.add_to_hass(hass)
+
+    polled = kcs_n1cx.KCSTraceMeN1CxDataClient.decode("0a1c2b01f42a320100001234c35001ff")
+    with patch.object(kcs_n1cx.KCSTraceMeN1CxDataClient, "parse_data", return_value=polled) as parse_data:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert parse_data.call_count == 1
+        assert hass.states.get("sensor.co2").state == "500.00"
+
+        hass.config_entries.async_update_entry(entry, options={const.CONF_MQTT: True})
+        await hass.async_block_till_done()
+        assert parse_data.call_count == 1
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=const.DEFAULT_SCAN_INTERVAL + 1))
+        await hass.async_block_till_done()
+        async_fire_mqtt_message(hass, TTN_TOPIC, ttn_message(DEV_EUI, 1000))
+        await flush_batch(hass)
+
+    assert parse_data.call_count == 1
+    assert hass.states.get("sensor.co2").state == "1000.00"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_setup_retried_without_mqtt(hass):
+    """An entry with mqtt ingestion is retried while the MQTT integration is not set up."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"},
+        options={const.CONF_MQTT: True}
+    )
+    entry.add_to_hass(hass)
+
+    with patch("homeassistant.components.mqtt.async_wait_for_mqtt_client", return_value=False):
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert entry.entry_id not in hass.data[const.DOMAIN][const.DATA_COORDINATOR]
+
+
+async def test_failed_subscribe_is_retried(hass, mqtt_mock):
+    """A failed subscription is not remembered, so subscribing again retries it."""
+    listener = uplink.KCSTraceMeN1CxUplinkListener(hass, {}, None)
+    topics = [const.DEFAULT_MQTT_TOPIC.split(",")[0]]
+
+    with patch("homeassistant.components.mqtt.async_subscribe", side_effect=HomeAssistantError("failed")):
+        with pytest.raises(HomeAssistantError):
+            await listener.async_subscribe(topics, [DEV_EUI])
+
+    await listener.async_subscribe(topics, [DEV_EUI])
+    assert len(listener._unsub_topics) == 1
+    listener.async_unsubscribe()
+
+
+async def test_options_reject_mqtt_without_integration(hass):
+    """Mqtt ingestion cannot be enabled while the MQTT integration is not set up."""
+    entry = MockConfigEntry(
+        domain=const.DOMAIN,
+        title="CO2",
+        data={const.CONF_DEV_EUI: DEV_EUI, const.CONF_GAS: True, "name": "CO2"}
+    )
+    entry.add_to_hass(hass)
+
+    with patch.object(kcs_n1cx.KCSTraceMeN1CxDataClient, "call_api", return_value=None):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        result = await hass.config_entries.options.async_configure(result["flow_id"], {const.CONF_MQTT: True})
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {const.CONF_MQTT: "mqtt_not_loaded"}
+        assert not entry.options
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()